@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import argparse
 import json
+import math
+import os
+import time
+from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
 from statistics import mean
 
 from rich import print
+from rich.markup import escape
 from rich.table import Table
 
-from agentic_ops.agents import run_incident
+from agentic_ops.agents import AgentState, run_incident
 from agentic_ops.config import SETTINGS
+from agentic_ops.profiling import NodeProfiler
 
 
 @dataclass
@@ -30,19 +37,74 @@ def load_incidents(path: Path) -> list[Incident]:
     return incidents
 
 
+def triage_all(incidents: list[Incident], profiler: NodeProfiler | None) -> list[tuple[AgentState, float]]:
+    outcomes = []
+    for incident in incidents:
+        start = time.perf_counter()
+        result = run_incident(alert=incident.alert, logs=incident.logs, profiler=profiler)
+        outcomes.append((result, time.perf_counter() - start))
+    return outcomes
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate Agentic Ops on labeled incidents.")
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        default=None,
+        help="Profile each graph node and write .prof files to this directory.",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=SETTINGS.profile_top_n,
+        help="Number of hotspots to print.",
+    )
+    parser.add_argument(
+        "--cassette",
+        type=Path,
+        default=None,
+        help=f"Cassette file for LLM/embedding calls (default: {SETTINGS.cassette_path}).",
+    )
+    parser.add_argument(
+        "--cassette-mode",
+        choices=["off", "record", "replay"],
+        default=None,
+        help="Record backend responses to the cassette or replay them from it.",
+    )
+    parser.add_argument(
+        "--no-speculation",
+        action="store_true",
+        help="Disable the speculative LLM call to measure the serial baseline.",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
+    if args.cassette is not None:
+        os.environ[SETTINGS.cassette_path_env] = str(args.cassette)
+    if args.cassette_mode is not None:
+        os.environ[SETTINGS.cassette_mode_env] = args.cassette_mode
+    if args.no_speculation:
+        os.environ[SETTINGS.speculation_disabled_env] = "1"
     incidents = load_incidents(SETTINGS.project_root / "data" / "incidents")
     if not incidents:
         print("No incidents found in data/incidents")
         return
 
+    profiling = NodeProfiler(out_dir=args.profile, top_n=args.profile_top) if args.profile else nullcontext()
+    with profiling as profiler:
+        outcomes = triage_all(incidents, profiler)
+
     rows = []
     root_correct = 0
     action_correct = 0
     mttr_reductions = []
+    latencies = []
 
-    for incident in incidents:
-        result = run_incident(alert=incident.alert, logs=incident.logs)
+    for incident, (result, latency) in zip(incidents, outcomes):
+        latencies.append(latency)
         root_hit = result.diagnosis == incident.expected_root_cause
         action_hit = result.action == incident.expected_action
         root_correct += int(root_hit)
@@ -60,12 +122,19 @@ def main() -> None:
                 incident.expected_action,
                 result.action,
                 "yes" if action_hit else "no",
+                f"{latency:.2f}",
+                "-" if result.retrieval_distance is None else f"{result.retrieval_distance:.3f}",
+                "yes" if result.speculative else "no",
             )
         )
 
     root_acc = root_correct / len(incidents)
     action_acc = action_correct / len(incidents)
     avg_mttr_reduction = mean(mttr_reductions)
+    speculative_count = sum(1 for result, _ in outcomes if result.speculative)
+    avg_latency = mean(latencies)
+    # Nearest-rank p95.
+    p95_latency = sorted(latencies)[math.ceil(0.95 * len(latencies)) - 1]
 
     table = Table(title="Agentic Ops Evaluation")
     table.add_column("ID")
@@ -75,6 +144,9 @@ def main() -> None:
     table.add_column("Expected Action")
     table.add_column("Predicted Action")
     table.add_column("Action Hit")
+    table.add_column("Latency (s)")
+    table.add_column("KB dist")
+    table.add_column("Speculative")
 
     for row in rows:
         table.add_row(*row)
@@ -83,9 +155,14 @@ def main() -> None:
     print(
         f"Root-cause accuracy: {root_acc:.2%}\n"
         f"Action accuracy: {action_acc:.2%}\n"
-        f"Avg MTTR reduction (min): {avg_mttr_reduction:.2f}"
+        f"Avg MTTR reduction (min): {avg_mttr_reduction:.2f}\n"
+        f"Triage latency (s): avg {avg_latency:.2f}, p95 {p95_latency:.2f}\n"
+        f"Answered speculatively: {speculative_count}/{len(incidents)}"
     )
 
+    if profiler is not None:
+        print(escape(profiler.summary()))
+
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-from dataclasses import dataclass
-from typing import Dict, List
+import re
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from langchain_ollama import ChatOllama
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableLambda
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
 
+from .cassette import CassetteChat, get_cassette
 from .config import SETTINGS
+from .profiling import NodeProfiler
 from .rag import load_vectorstore
 
 
@@ -53,14 +60,31 @@ class AgentState:
     diagnosis: str = ""
     action: str = ""
     runbook_update: str = ""
+    signals: Dict[str, str] = field(default_factory=dict)
+    speculative: Dict[str, str] = field(default_factory=dict)
+    retrieval_distance: Optional[float] = None
+
+
+_NOISE_LEVEL = re.compile(r"\b(INFO|DEBUG|TRACE)\b")
+
+_SPECULATION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SPECULATION_LOOP_LOCK = threading.Lock()
 
 
 def _llm_disabled() -> bool:
     return os.getenv(SETTINGS.llm_disabled_env, "0") == "1"
 
 
-def _get_llm() -> ChatOllama:
-    return ChatOllama(model=SETTINGS.llm_model, base_url=SETTINGS.ollama_base_url, format="json")
+def _speculation_disabled() -> bool:
+    return os.getenv(SETTINGS.speculation_disabled_env, "0") == "1"
+
+
+def _get_llm() -> ChatOllama | CassetteChat:
+    llm = ChatOllama(model=SETTINGS.llm_model, base_url=SETTINGS.ollama_base_url, format="json")
+    cassette = get_cassette()
+    if cassette is None:
+        return llm
+    return CassetteChat(llm, SETTINGS.llm_model, cassette)
 
 
 def _safe_json_extract(text: str) -> Dict[str, str]:
@@ -122,22 +146,14 @@ def _rule_based_diagnosis(alert: str, logs: str) -> Dict[str, str]:
     return {"root_cause": "unknown", "action": "none"}
 
 
-def retrieve_context(state: AgentState) -> AgentState:
-    vectorstore = load_vectorstore()
-    query = f"Alert: {state.alert}\nLogs: {state.logs}"
-    docs = vectorstore.similarity_search(query, k=SETTINGS.top_k)
-    context = "\n\n".join([doc.page_content for doc in docs])
-    state.context = context
-    return state
+def _reduce_logs(logs: str) -> str:
+    """Drop INFO/DEBUG noise so the speculative prompt stays short."""
+    lines = [line for line in logs.splitlines() if line.strip() and not _NOISE_LEVEL.search(line)]
+    reduced = "\n".join(lines) if lines else logs
+    return reduced[-SETTINGS.speculative_log_chars:]
 
 
-def diagnose(state: AgentState) -> AgentState:
-    if _llm_disabled():
-        result = _rule_based_diagnosis(state.alert, state.logs)
-        state.diagnosis = result["root_cause"]
-        state.action = result["action"]
-        return state
-
+def _diagnosis_messages(alert: str, logs: str, context: str) -> list:
     prompt = ChatPromptTemplate.from_messages(
         [
             (
@@ -153,15 +169,96 @@ def diagnose(state: AgentState) -> AgentState:
             ),
         ]
     )
+    return prompt.format_messages(alert=alert, logs=logs, context=context)
+
 
-    llm = _get_llm()
-    response = llm.invoke(prompt.format_messages(alert=state.alert, logs=state.logs, context=state.context))
-    result = _safe_json_extract(response.content)
+def _parse_llm_response(content: str, alert: str, logs: str) -> Dict[str, str]:
+    result = _safe_json_extract(content)
     if not result:
-        combined = f"{response.content}\n{state.alert}\n{state.logs}"
+        combined = f"{content}\n{alert}\n{logs}"
         result = _map_text_to_labels(combined)
+    return result
+
+
+def _ask_llm(alert: str, logs: str, context: str) -> Dict[str, str]:
+    response = _get_llm().invoke(_diagnosis_messages(alert, logs, context))
+    return _parse_llm_response(response.content, alert, logs)
+
+
+async def _aask_llm(alert: str, logs: str, context: str) -> Dict[str, str]:
+    response = await _get_llm().ainvoke(_diagnosis_messages(alert, logs, context))
+    return _parse_llm_response(response.content, alert, logs)
+
+
+def _speculation_loop() -> asyncio.AbstractEventLoop:
+    # One daemon event loop runs all speculative calls, so a discarded call
+    # never keeps the process alive on exit.
+    global _SPECULATION_LOOP
+    with _SPECULATION_LOOP_LOCK:
+        if _SPECULATION_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="speculate", daemon=True).start()
+            _SPECULATION_LOOP = loop
+    return _SPECULATION_LOOP
+
+
+def _start_speculation(state: AgentState) -> Optional[Future]:
+    if _llm_disabled() or _speculation_disabled():
+        return None
+    coro = _aask_llm(state.alert, _reduce_logs(state.logs), "(not retrieved)")
+    return asyncio.run_coroutine_threadsafe(coro, _speculation_loop())
+
+
+def _retrieval_adds_nothing(scored: List[Tuple[Document, float]]) -> bool:
+    """True when no retrieved chunk is close enough to inform the diagnosis.
+
+    Scores are squared L2 distances from the FAISS IndexFlatL2 (lower is
+    closer), compared against ``SETTINGS.retrieval_max_distance``.
+    """
+    return all(score > SETTINGS.retrieval_max_distance for _, score in scored)
+
+
+def retrieve_context(state: AgentState) -> Dict[str, Any]:
+    # Start the LLM on the reduced logs while retrieval runs. If retrieval
+    # turns up nothing relevant the speculative answer is used as-is;
+    # otherwise the task is cancelled, which closes its HTTP request so the
+    # backend stops generating, and diagnose asks again with the KB context.
+    speculation = _start_speculation(state)
+    query = f"Alert: {state.alert}\nLogs: {state.logs}"
+    try:
+        scored = load_vectorstore().similarity_search_with_score(query, k=SETTINGS.top_k)
+    except Exception:
+        if speculation is not None:
+            speculation.cancel()
+        raise
+    context = "\n\n".join([doc.page_content for doc, _ in scored])
+    update: Dict[str, Any] = {
+        "context": context,
+        "retrieval_distance": min((float(score) for _, score in scored), default=None),
+    }
+    if speculation is None:
+        return update
+    if _retrieval_adds_nothing(scored):
+        update["speculative"] = speculation.result()
+    else:
+        speculation.cancel()
+    return update
+
+
+def extract_signals(state: AgentState) -> Dict[str, Dict[str, str]]:
+    return {"signals": _rule_based_diagnosis(state.alert, state.logs)}
+
+
+def diagnose(state: AgentState) -> AgentState:
+    signals = state.signals or _rule_based_diagnosis(state.alert, state.logs)
+    if _llm_disabled():
+        state.diagnosis = signals["root_cause"]
+        state.action = signals["action"]
+        return state
+
+    result = state.speculative or _ask_llm(state.alert, state.logs, state.context)
     if not result:
-        result = _rule_based_diagnosis(state.alert, state.logs)
+        result = signals
     combined = f"{state.alert}\n{state.logs}"
     state.diagnosis = _normalize_root_cause(result.get("root_cause", "unknown"), combined)
     # Force consistency between root cause and action for reproducible metrics.
@@ -186,23 +283,41 @@ def scribe(state: AgentState) -> AgentState:
     return state
 
 
-def build_graph():
-    graph = StateGraph(AgentState)
-    graph.add_node("retrieve", RunnableLambda(retrieve_context))
-    graph.add_node("diagnose", RunnableLambda(diagnose))
-    graph.add_node("safety", RunnableLambda(safety_check))
-    graph.add_node("scribe", RunnableLambda(scribe))
+def _node(name: str, fn: Callable[[AgentState], Any], profiler: Optional[NodeProfiler]) -> RunnableLambda:
+    # Only wrap when profiling is requested so the default path has no overhead.
+    if profiler is None:
+        return RunnableLambda(fn)
+    return RunnableLambda(profiler.wrap(name, fn))
 
-    graph.set_entry_point("retrieve")
-    graph.add_edge("retrieve", "diagnose")
+
+def build_graph(profiler: Optional[NodeProfiler] = None):
+    graph = StateGraph(AgentState)
+    graph.add_node("retrieve", _node("retrieve", retrieve_context, profiler))
+    graph.add_node("signals", _node("signals", extract_signals, profiler))
+    graph.add_node("diagnose", _node("diagnose", diagnose, profiler))
+    graph.add_node("safety", _node("safety", safety_check, profiler))
+    graph.add_node("scribe", _node("scribe", scribe, profiler))
+
+    if profiler is None:
+        # Retrieval (with its speculative LLM call) and rule-based signals are
+        # independent, so they fan out in one step and join at diagnose.
+        for branch in ("retrieve", "signals"):
+            graph.add_edge(START, branch)
+        graph.add_edge(["retrieve", "signals"], "diagnose")
+    else:
+        # Run the fan-out serially while profiling so per-node numbers are not
+        # mixed with a sibling branch.
+        graph.set_entry_point("retrieve")
+        graph.add_edge("retrieve", "signals")
+        graph.add_edge("signals", "diagnose")
     graph.add_edge("diagnose", "safety")
     graph.add_edge("safety", "scribe")
     graph.add_edge("scribe", END)
     return graph.compile()
 
 
-def run_incident(alert: str, logs: str) -> AgentState:
-    app = build_graph()
+def run_incident(alert: str, logs: str, profiler: Optional[NodeProfiler] = None) -> AgentState:
+    app = build_graph(profiler)
     result = app.invoke(AgentState(alert=alert, logs=logs))
     if isinstance(result, AgentState):
         return result
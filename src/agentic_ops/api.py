@@ -1,12 +1,21 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import uuid
+from contextlib import nullcontext
+from typing import Optional
+
+from fastapi import FastAPI, Header, Response
 from pydantic import BaseModel
 
 from .agents import run_incident
+from .config import SETTINGS
+from .profiling import NodeProfiler
 
 app = FastAPI(title="Agentic Ops")
 
+PROFILE_HEADER = "X-Agentic-Profile"
+PROFILE_DIR_HEADER = "X-Agentic-Profile-Dir"
+
 
 class TriageRequest(BaseModel):
     alert: str
@@ -25,8 +34,18 @@ async def health() -> dict:
 
 
 @app.post("/triage", response_model=TriageResponse)
-async def triage(request: TriageRequest) -> TriageResponse:
-    result = run_incident(alert=request.alert, logs=request.logs)
+async def triage(
+    request: TriageRequest,
+    response: Response,
+    x_agentic_profile: Optional[str] = Header(default=None, alias=PROFILE_HEADER),
+) -> TriageResponse:
+    profiling = nullcontext()
+    if x_agentic_profile == "1":
+        profiling = NodeProfiler(out_dir=SETTINGS.profile_dir / uuid.uuid4().hex, top_n=SETTINGS.profile_top_n)
+    with profiling as profiler:
+        result = run_incident(alert=request.alert, logs=request.logs, profiler=profiler)
+    if profiler is not None:
+        response.headers[PROFILE_DIR_HEADER] = str(profiler.out_dir)
     return TriageResponse(
         root_cause=result.diagnosis,
         action=result.action,
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage
+
+from .config import SETTINGS
+
+CASSETTE_MODES = {"off", "record", "replay"}
+
+logger = logging.getLogger(__name__)
+
+_CASSETTES: Dict[tuple, "Cassette"] = {}
+_CASSETTES_LOCK = threading.Lock()
+
+
+class Cassette:
+    """Append-only JSONL store of backend responses keyed by request hash.
+
+    In ``record`` mode misses are fetched from the backend and appended; in
+    ``replay`` mode a miss is an error so runs stay reproducible. A torn final
+    line left by a crashed writer is skipped, and truncated in record mode.
+    Corruption before the last line is an error.
+    """
+
+    def __init__(self, path: Path, mode: str) -> None:
+        if mode not in CASSETTE_MODES - {"off"}:
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self._entries: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        offset = 0
+        with self.path.open("rb") as handle:
+            for number, line in enumerate(handle, start=1):
+                try:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["k"]] = entry["v"]
+                except (ValueError, KeyError, TypeError) as exc:
+                    if handle.read(1):
+                        raise ValueError(f"Corrupt cassette entry at {self.path}:{number}") from exc
+                    logger.warning("Skipping torn last line %d of cassette %s", number, self.path)
+                    if self.mode == "record":
+                        with self.path.open("r+b") as writer:
+                            writer.truncate(offset)
+                    return
+                offset += len(line)
+                if not line.endswith(b"\n") and self.mode == "record":
+                    # Complete entry without its newline: terminate it before appending.
+                    with self.path.open("ab") as writer:
+                        writer.write(b"\n")
+
+    @staticmethod
+    def key(kind: str, model: str, payload: Any) -> str:
+        raw = json.dumps([kind, model, payload], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is None and self.mode == "replay":
+            raise LookupError(f"No cassette entry {key[:12]} in {self.path}; re-run in record mode")
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        line = json.dumps({"k": key, "v": value}, separators=(",", ":"))
+        with self._lock:
+            if key in self._entries:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+            self._entries[key] = value
+
+
+def get_cassette() -> Optional[Cassette]:
+    mode = os.getenv(SETTINGS.cassette_mode_env, "off")
+    if mode == "off":
+        return None
+    path = Path(os.getenv(SETTINGS.cassette_path_env, str(SETTINGS.cassette_path)))
+    with _CASSETTES_LOCK:
+        cassette = _CASSETTES.get((path, mode))
+        if cassette is None:
+            cassette = Cassette(path, mode)
+            _CASSETTES[(path, mode)] = cassette
+    return cassette
+
+
+class CassetteChat:
+    """Wraps a chat model so ``invoke`` is served from the cassette."""
+
+    def __init__(self, llm: Any, model: str, cassette: Cassette) -> None:
+        self.llm = llm
+        self.model = model
+        self.cassette = cassette
+
+    def invoke(self, messages: Sequence[BaseMessage]) -> AIMessage:
+        payload = [[message.type, message.content] for message in messages]
+        key = Cassette.key("chat", self.model, payload)
+        content = self.cassette.get(key)
+        if content is None:
+            content = self.llm.invoke(messages).content
+            self.cassette.put(key, content)
+        return AIMessage(content=content)
+
+    async def ainvoke(self, messages: Sequence[BaseMessage]) -> AIMessage:
+        payload = [[message.type, message.content] for message in messages]
+        key = Cassette.key("chat", self.model, payload)
+        content = self.cassette.get(key)
+        if content is None:
+            content = (await self.llm.ainvoke(messages)).content
+            self.cassette.put(key, content)
+        return AIMessage(content=content)
+
+
+class CassetteEmbeddings(Embeddings):
+    """Wraps an embeddings backend so vectors are served from the cassette."""
+
+    def __init__(self, embeddings: Embeddings, model: str, cassette: Cassette) -> None:
+        self.embeddings = embeddings
+        self.model = model
+        self.cassette = cassette
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [Cassette.key("embed", self.model, text) for text in texts]
+        vectors = [self.cassette.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            fetched = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, fetched):
+                self.cassette.put(keys[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        key = Cassette.key("embed_query", self.model, text)
+        vector = self.cassette.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cassette.put(key, vector)
+        return vector
@@ -1,34 +1,63 @@
 from __future__ import annotations
 
 import json
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Optional
 
 import typer
 from rich import print
 
 from .agents import run_incident
 from .config import SETTINGS
-from .rag import build_vectorstore
+from .profiling import NodeProfiler
+from .rag import IngestStats, build_vectorstore
 
 app = typer.Typer(help="Agentic Ops CLI")
 
 
 @app.command()
-def ingest() -> None:
+def ingest(
+    batch_size: int = typer.Option(SETTINGS.ingest_batch_size, min=1, help="Chunks per embedding request."),
+    workers: int = typer.Option(SETTINGS.ingest_workers, min=1, help="Concurrent embedding requests."),
+) -> None:
     """Ingest kb/ into the local Chroma vector store."""
-    build_vectorstore()
-    print(f"Ingested KB into {SETTINGS.faiss_dir}")
+    final = IngestStats()
+    last_report = 0.0
+
+    def report(stats: IngestStats) -> None:
+        nonlocal final, last_report
+        final = stats
+        # Throttle to about one line per second on large knowledge bases.
+        if stats.elapsed_seconds - last_report >= 1.0:
+            last_report = stats.elapsed_seconds
+            print(f"{stats.chunks} chunks from {stats.files} files ({stats.chunks_per_second:.1f} chunks/s)")
+
+    build_vectorstore(batch_size=batch_size, workers=workers, on_progress=report)
+    summary = f"{final.chunks} chunks from {final.files} files in {final.elapsed_seconds:.1f}s"
+    print(f"Ingested {summary} into {SETTINGS.faiss_dir}")
 
 
 @app.command()
-def triage(alert: str, logs: str) -> None:
+def triage(
+    alert: str,
+    logs: str,
+    profile: Optional[Path] = typer.Option(
+        None, help="Profile each graph node and write .prof files to this directory."
+    ),
+    profile_top: int = typer.Option(SETTINGS.profile_top_n, help="Number of hotspots to print."),
+) -> None:
     """Run a single incident triage."""
-    result = run_incident(alert=alert, logs=logs)
+    profiling = NodeProfiler(out_dir=profile, top_n=profile_top) if profile else nullcontext()
+    with profiling as profiler:
+        result = run_incident(alert=alert, logs=logs, profiler=profiler)
     print(json.dumps({
         "root_cause": result.diagnosis,
         "action": result.action,
         "runbook_update": result.runbook_update,
     }, indent=2))
+    if profiler is not None:
+        typer.echo(profiler.summary())
 
 
 @app.command()
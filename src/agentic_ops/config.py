@@ -9,11 +9,27 @@ class Settings:
     project_root: Path = Path(__file__).resolve().parents[2]
     kb_dir: Path = project_root / "kb"
     faiss_dir: Path = project_root / "data" / "faiss"
+    profile_dir: Path = project_root / "data" / "profiles"
+    cassette_path: Path = project_root / "data" / "cassettes" / "llm.jsonl"
     ollama_base_url: str = "http://localhost:11434"
     llm_model: str = "llama3.1:8b"
     embed_model: str = "nomic-embed-text"
     llm_disabled_env: str = "LLM_DISABLED"
+    cassette_mode_env: str = "AGENTIC_CASSETTE_MODE"
+    cassette_path_env: str = "AGENTIC_CASSETTE"
+    speculation_disabled_env: str = "SPECULATION_DISABLED"
     top_k: int = 4
+    chunk_size: int = 900
+    chunk_overlap: int = 120
+    ingest_batch_size: int = 64
+    ingest_workers: int = 4
+    speculative_log_chars: int = 4000
+    # Squared L2 distance (FAISS IndexFlatL2) above which a retrieved chunk is
+    # treated as irrelevant. Ollama returns unit-length embeddings, so 1.0 is a
+    # cosine similarity of 0.5. Not yet calibrated: check the "KB dist" column
+    # of scripts/evaluate.py against accuracy before changing it.
+    retrieval_max_distance: float = 1.0
+    profile_top_n: int = 20
 
 
 SETTINGS = Settings()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Profiled node calls are serialized process-wide: cProfile allows only one
+# active profiler per interpreter on Python 3.12+, and tracemalloc peaks are
+# process-wide, so overlapping nodes would corrupt each other's numbers.
+_PROFILE_LOCK = threading.Lock()
+
+
+@dataclass
+class NodeStats:
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    peak_bytes: int = 0
+    stats: Optional[pstats.Stats] = None
+
+
+@dataclass
+class NodeProfiler:
+    """Collects cProfile and tracemalloc data per graph node.
+
+    Each profiled node call is dumped as a ``.prof`` file into ``out_dir``;
+    these load directly in flameprof, snakeviz or tuna for flamegraphs.
+    On Python 3.11 cProfile records only the node's own thread; on 3.12+ it
+    is built on ``sys.monitoring`` and also records frames from other threads
+    running at the time, such as the speculative LLM call started by
+    ``retrieve``. The memory figure is the ``tracemalloc`` peak above what was
+    already allocated when the node started. It is process-wide, so it also
+    counts allocations made by other threads while the node runs.
+    """
+
+    out_dir: Path
+    top_n: int = 20
+    nodes: Dict[str, NodeStats] = field(default_factory=dict)
+    _seq: int = 0
+    _owns_tracing: bool = False
+
+    def __post_init__(self) -> None:
+        self.out_dir = Path(self.out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def wrap(self, name: str, fn: Callable[[T], T]) -> Callable[[T], T]:
+        def profiled(state: T) -> T:
+            return self.run(name, fn, state)
+
+        return profiled
+
+    def __enter__(self) -> "NodeProfiler":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.write_combined()
+        if self._owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracing = False
+
+    def run(self, name: str, fn: Callable[[T], T], state: T) -> T:
+        with _PROFILE_LOCK:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracing = True
+            tracemalloc.reset_peak()
+            # reset_peak() sets the peak to current usage, not zero.
+            baseline, _ = tracemalloc.get_traced_memory()
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                return fn(state)
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                self._record(name, elapsed, peak - baseline, profiler)
+
+    def _record(self, name: str, elapsed: float, peak: int, profiler: cProfile.Profile) -> None:
+        self._seq += 1
+        node = self.nodes.setdefault(name, NodeStats(name=name))
+        node.calls += 1
+        node.wall_seconds += elapsed
+        node.peak_bytes = max(node.peak_bytes, peak)
+        profiler.dump_stats(str(self.out_dir / f"{self._seq:05d}_{name}.prof"))
+        if node.stats is None:
+            node.stats = pstats.Stats(profiler)
+        else:
+            node.stats.add(profiler)
+
+    def combined_stats(self, stream: Optional[io.TextIOBase] = None) -> Optional[pstats.Stats]:
+        profiled = [node.stats for node in self.nodes.values() if node.stats is not None]
+        if not profiled:
+            return None
+        combined = pstats.Stats(stream=stream)
+        combined.add(*profiled)
+        return combined
+
+    def write_combined(self) -> Optional[Path]:
+        combined = self.combined_stats()
+        if combined is None:
+            return None
+        path = self.out_dir / "combined.prof"
+        combined.dump_stats(str(path))
+        return path
+
+    def node_rows(self) -> List[tuple]:
+        return [
+            (node.name, node.calls, node.wall_seconds, node.peak_bytes / (1024 * 1024))
+            for node in self.nodes.values()
+        ]
+
+    def summary(self) -> str:
+        lines = ["Per-node profile:"]
+        for name, calls, wall, peak_mib in self.node_rows():
+            lines.append(f"- {name}: calls={calls} wall={wall:.3f}s peak_mem={peak_mib:.2f}MiB")
+        buffer = io.StringIO()
+        combined = self.combined_stats(stream=buffer)
+        if combined is not None:
+            combined.sort_stats("cumulative").print_stats(self.top_n)
+            lines.append(f"Top {self.top_n} hotspots (cumulative):")
+            lines.append(buffer.getvalue().strip())
+        lines.append(f"Profiles written to {self.out_dir}")
+        return "\n".join(lines)
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
 
 from langchain_ollama import OllamaEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from .cassette import CassetteEmbeddings, get_cassette
 from .config import SETTINGS
 
 
@@ -17,35 +23,139 @@ def _iter_markdown_files(root: Path) -> Iterable[Path]:
             yield path
 
 
-def load_kb_documents(kb_dir: Path) -> List[Document]:
-    docs: List[Document] = []
+def iter_kb_documents(kb_dir: Path) -> Iterator[Document]:
     for path in _iter_markdown_files(kb_dir):
         text = path.read_text(encoding="utf-8")
-        docs.append(Document(page_content=text, metadata={"source": str(path)}))
-    return docs
+        yield Document(page_content=text, metadata={"source": str(path)})
+
+
+def load_kb_documents(kb_dir: Path) -> List[Document]:
+    return list(iter_kb_documents(kb_dir))
+
+
+@dataclass
+class IngestStats:
+    files: int = 0
+    chunks: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
 
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.elapsed_seconds if self.elapsed_seconds else 0.0
 
-def build_vectorstore() -> FAISS:
-    kb_dir = SETTINGS.kb_dir
-    docs = load_kb_documents(kb_dir)
-    splitter = RecursiveCharacterTextSplitter(chunk_size=900, chunk_overlap=120)
-    chunks = splitter.split_documents(docs)
 
+def _get_embeddings(use_cassette: bool = True) -> OllamaEmbeddings | CassetteEmbeddings:
     embeddings = OllamaEmbeddings(
         model=SETTINGS.embed_model,
         base_url=SETTINGS.ollama_base_url,
     )
+    cassette = get_cassette() if use_cassette else None
+    if cassette is None:
+        return embeddings
+    return CassetteEmbeddings(embeddings, SETTINGS.embed_model, cassette)
+
+
+def _iter_chunk_batches(
+    docs: Iterable[Document],
+    splitter: RecursiveCharacterTextSplitter,
+    batch_size: int,
+    stats: IngestStats,
+) -> Iterator[List[Document]]:
+    batch: List[Document] = []
+    for doc in docs:
+        stats.files += 1
+        for chunk in splitter.split_documents([doc]):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _add_batch(
+    vectorstore: Optional[FAISS],
+    embeddings: Embeddings,
+    batch: List[Document],
+    vectors: List[List[float]],
+) -> FAISS:
+    text_embeddings = list(zip([chunk.page_content for chunk in batch], vectors))
+    metadatas = [chunk.metadata for chunk in batch]
+    if vectorstore is None:
+        return FAISS.from_embeddings(text_embeddings=text_embeddings, embedding=embeddings, metadatas=metadatas)
+    vectorstore.add_embeddings(text_embeddings=text_embeddings, metadatas=metadatas)
+    return vectorstore
+
 
-    vectorstore = FAISS.from_documents(documents=chunks, embedding=embeddings)
+def build_vectorstore(
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    on_progress: Optional[Callable[[IngestStats], None]] = None,
+) -> FAISS:
+    """Stream the KB into FAISS, embedding chunk batches concurrently.
+
+    Files are read one at a time, each in full, and split into batches of
+    ``batch_size`` chunks. Up to ``workers`` batches are embedded
+    concurrently, and at most twice that many are in flight; that is the
+    only part of memory that is bounded. The FAISS docstore and flat index
+    still hold every chunk's text and vector until ``save_local``.
+
+    Ingest always calls the embedding backend directly and skips the
+    record/replay cassette, which would otherwise keep every KB vector in
+    memory and on disk a second time.
+    """
+    if batch_size is None:
+        batch_size = SETTINGS.ingest_batch_size
+    if workers is None:
+        workers = SETTINGS.ingest_workers
+    if batch_size < 1 or workers < 1:
+        raise ValueError("batch_size and workers must be at least 1")
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=SETTINGS.chunk_size,
+        chunk_overlap=SETTINGS.chunk_overlap,
+    )
+    embeddings = _get_embeddings(use_cassette=False)
+    stats = IngestStats()
+    batches = _iter_chunk_batches(iter_kb_documents(SETTINGS.kb_dir), splitter, batch_size, stats)
+
+    vectorstore: Optional[FAISS] = None
+    pending: Deque[Tuple[List[Document], Future]] = deque()
+    started = time.perf_counter()
+
+    def drain_one() -> None:
+        nonlocal vectorstore
+        batch, future = pending.popleft()
+        vectorstore = _add_batch(vectorstore, embeddings, batch, future.result())
+        stats.chunks += len(batch)
+        stats.batches += 1
+        stats.elapsed_seconds = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(stats)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for batch in batches:
+                texts = [chunk.page_content for chunk in batch]
+                pending.append((batch, pool.submit(embeddings.embed_documents, texts)))
+                if len(pending) >= workers * 2:
+                    drain_one()
+            while pending:
+                drain_one()
+        except BaseException:
+            # Fail fast: drop queued batches so only those already running are awaited.
+            for _, future in pending:
+                future.cancel()
+            raise
+
+    if vectorstore is None:
+        raise ValueError(f"No KB documents found in {SETTINGS.kb_dir}")
     vectorstore.save_local(str(SETTINGS.faiss_dir))
     return vectorstore
 
 
 def load_vectorstore() -> FAISS:
-    embeddings = OllamaEmbeddings(
-        model=SETTINGS.embed_model,
-        base_url=SETTINGS.ollama_base_url,
-    )
+    embeddings = _get_embeddings()
     return FAISS.load_local(
         str(SETTINGS.faiss_dir),
         embeddings,